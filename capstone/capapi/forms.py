@@ -1,17 +1,41 @@
 import re
-import requests
 
 from django.conf import settings
 from django.contrib.auth.forms import AuthenticationForm, UserCreationForm
 from django import forms
+from django.utils.functional import SimpleLazyObject
 from django.utils.safestring import mark_safe
 from django.utils.text import format_lazy
 
 from capapi.models import CapUser, ResearchContract, HarvardContract, EmailBlocklist
+from capapi.tasks import validate_signup_email_with_mailgun
 from capweb.helpers import reverse, reverse_lazy
 from config.logging import logger
 
 
+whitespace_re = re.compile(r'\s')
+
+# reverse() isn't ready at import time, so resolve these urls on first use and reuse them after that
+terms_url = SimpleLazyObject(lambda: reverse('terms'))
+resend_verification_url = SimpleLazyObject(lambda: reverse('resend-verification'))
+
+
+def is_trusted_email_domain(email):
+    """
+        Return True if email is at one of settings.TRUSTED_EMAIL_DOMAINS or one of their subdomains.
+
+        >>> settings = getfixture('settings')
+        >>> settings.TRUSTED_EMAIL_DOMAINS = ['harvard.edu']
+        >>> assert is_trusted_email_domain('foo@harvard.edu')
+        >>> assert is_trusted_email_domain('foo@law.Harvard.edu')
+        >>> assert not is_trusted_email_domain('foo@notharvard.edu')
+        >>> assert not is_trusted_email_domain('foo@harvard.edu.example.com')
+    """
+    trusted_domains = frozenset(settings.TRUSTED_EMAIL_DOMAINS)
+    labels = email.rsplit('@', 1)[-1].lower().split('.')
+    return any('.'.join(labels[i:]) in trusted_domains for i in range(len(labels)))
+
+
 class LoginForm(AuthenticationForm):
     username = forms.EmailField(
         max_length=254,
@@ -22,7 +46,7 @@ class LoginForm(AuthenticationForm):
         """ Override AuthenticationForm to block login with unverified email address. """
         if not user.email_verified:
             raise forms.ValidationError(
-                mark_safe("This email is registered but not yet verified. <a href='%s'>Resend verification</a>?" % reverse('resend-verification')),
+                mark_safe("This email is registered but not yet verified. <a href='%s'>Resend verification</a>?" % resend_verification_url),
                 code='unverified',
             )
         return super().confirm_login_allowed(user)
@@ -38,20 +62,26 @@ class RegisterUserForm(UserCreationForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # set label here because reverse() isn't ready when defining the class
+        # set label here because terms_url can't be resolved when defining the class
         self.fields['mailing_list'].label = mark_safe("<small>(optional)</small> Sign me up for the CAP newsletter: Lawvocado.")
-        self.fields['agreed_to_tos'].label = mark_safe("I have read and agree to the <a href='%s' target='_blank'>Terms of Use</a>." % reverse('terms'))
+        self.fields['agreed_to_tos'].label = mark_safe("I have read and agree to the <a href='%s' target='_blank'>Terms of Use</a>." % terms_url)
 
     class Meta:
         model = CapUser
         fields = ["email", "first_name", "last_name", "password1", "password2", "agreed_to_tos", "mailing_list"]
 
     def clean_email(self):
-        """ Ensure that email address doesn't match an existing CapUser.normalized_email. """
+        """
+            Ensure that email address doesn't match an existing CapUser.normalized_email or the EmailBlocklist.
+
+            Only cheap local checks belong here. They run before save(), so rejected addresses never pay for
+            password hashing; the slow mailgun check is queued by save() once the user exists.
+        """
         email = self.cleaned_data.get("email")
-        if re.search(r'\s', email):
+        if whitespace_re.search(email):
             raise forms.ValidationError("Email address may not contain spaces.")
-        if CapUser.objects.filter(normalized_email=CapUser.normalize_email(email)).exists():
+        normalized_email = CapUser.normalize_email(email)
+        if CapUser.objects.filter(normalized_email=normalized_email).exists():
             raise forms.ValidationError("A user with the same email address has already registered.")
 
         # validate email against blocklists
@@ -59,27 +89,17 @@ class RegisterUserForm(UserCreationForm):
             logger.warning("Email address blocked: %s" % email)
             raise forms.ValidationError("This email address is invalid. If you believe this is an error, please contact us.")
 
-        # validate email against mailgun api
-        if settings.VALIDATE_EMAIL_SIGNUPS:
-            try:
-                response = requests.get(
-                    "https://api.mailgun.net/v4/address/validate",
-                    auth=("api", settings.MAILGUN_API_KEY),
-                    params={"address": email})
-                response.raise_for_status()
-            except requests.RequestException:
-                raise forms.ValidationError("Cannot connect to email validation server. If this problem persists, please contact us.")
-            response_json = response.json()
-            if response_json['result'] == 'undeliverable' or (response_json['result'] == 'do_not_send' and 'mailbox_is_disposable_address' in response_json['reason']):
-                # reject undeliverable addresses and disposable addresses
-                logger.warning("Invalid email address: %s" % response_json)
-                raise forms.ValidationError("This email address is invalid. If you believe this is an error, please contact us.")
-
         return email
 
     def save(self, commit=True):
+        # validate email against mailgun api in the background, so signup doesn't wait on a remote request.
+        # Until the check clears, the user can't verify, and the task sends the verification email.
+        validate_email = settings.VALIDATE_EMAIL_SIGNUPS and not is_trusted_email_domain(self.instance.email)
+        self.instance.email_validation_pending = validate_email
         user = super().save(commit)
         user.create_nonce()
+        if validate_email:
+            validate_signup_email_with_mailgun.delay(user.pk)
         return user
 
 
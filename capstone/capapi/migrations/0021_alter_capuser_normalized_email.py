@@ -0,0 +1,18 @@
+# Generated by Django 3.2.22 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('capapi', '0020_auto_20220114_1905'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='capuser',
+            name='normalized_email',
+            field=models.CharField(db_index=True, help_text='Used to ensure that new emails are unique.', max_length=255),
+        ),
+    ]
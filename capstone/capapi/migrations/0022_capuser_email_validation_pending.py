@@ -0,0 +1,18 @@
+# Generated by Django 3.2.22 on 2026-10-15 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('capapi', '0021_alter_capuser_normalized_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='capuser',
+            name='email_validation_pending',
+            field=models.BooleanField(default=False, help_text='Whether the email address is waiting on the mailgun validation check. Users can\'t verify until it clears.'),
+        ),
+    ]
@@ -1,4 +1,5 @@
 from datetime import timedelta
+import time
 import uuid
 import email_normalize
 from netaddr import IPAddress, AddrFormatError, IPNetwork
@@ -8,6 +9,8 @@ from rest_framework.authtoken.models import Token
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, AnonymousUser, PermissionsMixin
 from django.core.exceptions import PermissionDenied, ObjectDoesNotExist
 from django.db import models, IntegrityError, transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
 from django.utils import timezone
 from django.conf import settings
 
@@ -57,7 +60,7 @@ class CapUser(PermissionsMixin, AbstractBaseUser):
         db_index=True,
         error_messages={'unique': "A user with that email address already exists."}
     )
-    normalized_email = models.CharField(max_length=255, help_text="Used to ensure that new emails are unique.")
+    normalized_email = models.CharField(max_length=255, db_index=True, help_text="Used to ensure that new emails are unique.")
 
     first_name = models.CharField(max_length=30)
     last_name = models.CharField(max_length=30)
@@ -73,6 +76,7 @@ class CapUser(PermissionsMixin, AbstractBaseUser):
     is_active = models.BooleanField(default=True)
 
     email_verified = models.BooleanField(default=False, help_text="Whether user has verified their email address")
+    email_validation_pending = models.BooleanField(default=False, help_text="Whether the email address is waiting on the mailgun validation check. Users can't verify until it clears.")
     activation_nonce = models.CharField(max_length=40, null=True, blank=True)
     nonce_expires = models.DateTimeField(null=True, blank=True)
 
@@ -353,9 +357,35 @@ class EmailBlocklist(models.Model):
     notes = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # (blocked domains, whether any regexes exist, expiration time), loaded on demand by get_cached_blocklist()
+    _cached_blocklist = None
+
     def __str__(self):
         return self.domain
 
+    @classmethod
+    def reset_cache(cls):
+        cls._cached_blocklist = None
+
+    @classmethod
+    def get_cached_blocklist(cls):
+        """
+            Return (blocked_domains, has_regexes) from a process-local cache, refreshed from the database after
+            EMAIL_BLOCKLIST_CACHE_TIMEOUT seconds. Saves and deletes in this process (including queryset deletes)
+            reset the cache via reset_email_blocklist_cache; queryset update() sends no signals, and edits in other
+            processes are picked up when the cache expires.
+        """
+        # read the attribute once, since reset_email_blocklist_cache may clear it from another thread
+        cached = cls._cached_blocklist
+        if cached is None or cached[2] < time.monotonic():
+            rows = list(cls.objects.values_list('domain', 'regex'))
+            cached = cls._cached_blocklist = (
+                frozenset(domain for domain, regex in rows if domain),
+                any(regex for domain, regex in rows),
+                time.monotonic() + settings.EMAIL_BLOCKLIST_CACHE_TIMEOUT,
+            )
+        return cached[:2]
+
     @classmethod
     def email_allowed(cls, email):
         """
@@ -369,14 +399,20 @@ class EmailBlocklist(models.Model):
             >>> assert not EmailBlocklist.email_allowed('foo@blocked.com')
             >>> assert not EmailBlocklist.email_allowed('foo@blocked.org')
             >>> assert not EmailBlocklist.email_allowed("foo@'\\'blocked.org")  # make sure 'extra()' is injection safe
+            >>> _ = email_blocklist_factory(domain='good.com')  # cached blocklist is reset on save
+            >>> assert not EmailBlocklist.email_allowed('foo@good.com')
+            >>> _ = EmailBlocklist.objects.filter(domain='good.com').delete()  # ... and on queryset delete
+            >>> assert EmailBlocklist.email_allowed('foo@good.com')
         """
         parts = email.lower().split('@')
         if len(parts) != 2:
             return False
         domain = parts[1]
+        blocked_domains, has_regexes = cls.get_cached_blocklist()
         return (
-            not cls.objects.filter(domain=domain).exists()
-            and not cls.objects.exclude(regex='').extra(where=["%s ~ regex"], params=[email]).exists()
+            domain not in blocked_domains
+            # regexes use postgres syntax, so they have to be checked in the database
+            and not (has_regexes and cls.objects.exclude(regex='').extra(where=["%s ~ regex"], params=[email]).exists())
         )
 
     @classmethod
@@ -398,3 +434,14 @@ class EmailBlocklist(models.Model):
                     OR (regex != '' AND lower(u.email) ~ regex)
                 ) AND is_active is true
         """))
+
+
+@receiver([post_save, post_delete], sender=EmailBlocklist)
+def reset_email_blocklist_cache(sender, **kwargs):
+    """
+        Clear the cached blocklist when a row changes. post_delete also fires for each row of a queryset delete.
+        Clear now so this transaction sees its own change, and again on commit in case another thread reloaded
+        the old rows in between.
+    """
+    sender.reset_cache()
+    transaction.on_commit(sender.reset_cache)
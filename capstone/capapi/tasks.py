@@ -1,5 +1,6 @@
 from datetime import timedelta
 import requests
+from requests.adapters import HTTPAdapter
 
 from celery import shared_task
 from django.conf import settings
@@ -9,6 +10,12 @@ from django.db import connections
 from django.utils import timezone
 
 from capweb.helpers import statement_timeout, StatementTimeout
+from config.logging import logger
+
+
+# shared across tasks in a worker process so repeated mailgun calls can reuse a connection
+mailgun_session = requests.Session()
+mailgun_session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=8, max_retries=1))
 
 
 @shared_task
@@ -61,3 +68,51 @@ def cache_query_count(sql, cache_key):
             cache.set(cache_key, result[0], settings.CACHED_COUNT_TIMEOUT)
     except StatementTimeout:
         pass  # this count takes too long to calculate -- move on
+
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def validate_signup_email_with_mailgun(self, user_id):
+    """
+        Check a newly registered user's email address against the mailgun validation api, and deactivate the account
+        if the address is undeliverable or disposable. Otherwise clear email_validation_pending (verify_user refuses
+        pending users) and send the verification email.
+
+        If mailgun can't be reached after max_retries, the address is let through and an error is logged.
+    """
+    from capapi.models import CapUser  # import here to avoid circular import
+    from capapi.resources import send_new_signup_email
+
+    try:
+        user = CapUser.objects.get(pk=user_id)
+    except CapUser.DoesNotExist:
+        return
+
+    try:
+        response = mailgun_session.get(
+            "https://api.mailgun.net/v4/address/validate",
+            auth=("api", settings.MAILGUN_API_KEY),
+            params={"address": user.email},
+            timeout=(2, 5))  # (connect, read)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        if self.request.retries >= self.max_retries:
+            logger.error("Unable to validate email address for user %s, leaving account active: %s" % (user_id, e))
+            response = None
+        elif isinstance(e, requests.Timeout):
+            # mailgun is slow rather than failing, so try again soon
+            logger.warning("Timed out validating email address for user %s" % user_id)
+            raise self.retry(exc=e, countdown=10)
+        else:
+            raise self.retry(exc=e)
+
+    response_json = response.json() if response is not None else {'result': None}
+    if response_json['result'] == 'undeliverable' or (response_json['result'] == 'do_not_send' and 'mailbox_is_disposable_address' in response_json['reason']):
+        # reject undeliverable addresses and disposable addresses
+        logger.warning("Invalid email address: %s" % response_json)
+        user.is_active = False
+        # CapUser.save() sets deactivated_date; don't overwrite fields changed since the user was loaded
+        user.save(update_fields=['is_active', 'deactivated_date'])
+    else:
+        user.email_validation_pending = False
+        user.save(update_fields=['email_validation_pending'])
+        send_new_signup_email(None, user)
@@ -1,8 +1,11 @@
 import re
 
+import mock
 import pytest
+import requests
 from datetime import timedelta
 
+from celery.exceptions import Retry
 from django.conf import settings
 from django.core import mail
 from django.utils import timezone
@@ -10,6 +13,7 @@ from rest_framework.authtoken.models import Token
 
 from capapi import api_reverse
 from capapi.models import CapUser
+from capapi.tasks import validate_signup_email_with_mailgun
 from capapi.tests.helpers import check_response
 from capweb.helpers import reverse
 
@@ -94,6 +98,87 @@ def test_registration_flow(client, restricted_case, elasticsearch, email_blockli
     })
     check_response(response, content_includes="A user with the same email address has already registered.")
 
+@pytest.mark.django_db(databases=['default'])
+@pytest.mark.parametrize("mailgun_result, is_active", [
+    ({'result': 'deliverable', 'reason': []}, True),
+    ({'result': 'undeliverable', 'reason': []}, False),
+    ({'result': 'do_not_send', 'reason': ['mailbox_is_disposable_address']}, False),
+])
+def test_registration_mailgun_validation(client, settings, mailoutbox, mailgun_result, is_active):
+    settings.VALIDATE_EMAIL_SIGNUPS = True
+    mailgun_response = mock.Mock(**{'json.return_value': mailgun_result})
+    with mock.patch('capapi.tasks.mailgun_session.get', return_value=mailgun_response) as mailgun_get:
+        response = client.post(reverse('register'), {
+            'email': 'new_user@example.com',
+            'first_name': 'First',
+            'last_name': 'Last',
+            'password1': 'Password2',
+            'password2': 'Password2',
+            'agreed_to_tos': 'on',
+        })
+    check_response(response, content_includes="Please check your email for a verification link.")
+    assert mailgun_get.call_args.kwargs['params'] == {'address': 'new_user@example.com'}
+    user = CapUser.objects.get(email='new_user@example.com')
+    assert user.is_active == is_active
+    # verification email is only sent once the address passes
+    assert user.email_validation_pending != is_active
+    assert len(mailoutbox) == (1 if is_active else 0)
+
+@pytest.mark.django_db(databases=['default'])
+def test_registration_mailgun_skipped_for_trusted_domain(client, settings):
+    settings.VALIDATE_EMAIL_SIGNUPS = True
+    settings.TRUSTED_EMAIL_DOMAINS = ['edu']
+    with mock.patch('capapi.tasks.mailgun_session.get') as mailgun_get:
+        response = client.post(reverse('register'), {
+            'email': 'new_user@law.harvard.edu',
+            'first_name': 'First',
+            'last_name': 'Last',
+            'password1': 'Password2',
+            'password2': 'Password2',
+            'agreed_to_tos': 'on',
+        })
+    check_response(response, content_includes="Please check your email for a verification link.")
+    assert not mailgun_get.called
+    assert CapUser.objects.get(email='new_user@law.harvard.edu').is_active
+
+@pytest.mark.django_db(databases=['default'])
+def test_verification_blocked_while_mailgun_validation_pending(client, cap_user_factory, mailoutbox):
+    user = cap_user_factory(email_validation_pending=True)
+    verify_url = reverse('verify-user', kwargs={'user_id': user.pk, 'activation_nonce': user.activation_nonce})
+
+    # can't verify until the address passes validation
+    response = client.get(verify_url)
+    check_response(response, content_includes="still checking this email address")
+    user.refresh_from_db()
+    assert not user.email_verified
+
+    # can't get a link resent either
+    response = client.post(reverse('resend-verification'), {'email': user.email})
+    check_response(response, content_includes="still checking this email address")
+    assert len(mailoutbox) == 0
+
+    # passing validation clears the flag and sends the verification email
+    validate_signup_email_with_mailgun(user.pk)
+    user.refresh_from_db()
+    assert not user.email_validation_pending
+    assert len(mailoutbox) == 1
+
+    response = client.get(verify_url)
+    check_response(response)
+    user.refresh_from_db()
+    assert user.email_verified
+
+@pytest.mark.django_db(databases=['default'])
+def test_mailgun_validation_timeout_retries(cap_user_factory):
+    user = cap_user_factory()
+    with mock.patch('capapi.tasks.mailgun_session.get', side_effect=requests.Timeout), \
+            mock.patch.object(validate_signup_email_with_mailgun, 'retry', side_effect=Retry()) as retry:
+        with pytest.raises(Retry):
+            validate_signup_email_with_mailgun(user.pk)
+    assert retry.call_args.kwargs['countdown'] == 10
+    user.refresh_from_db()
+    assert user.is_active
+
 @pytest.mark.django_db(databases=['default', 'capdb'])
 def test_login_wrong_password(auth_user, client):
     response = client.post(reverse('login'), {
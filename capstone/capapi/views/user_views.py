@@ -35,7 +35,9 @@ def register_user(request):
     form = form_for_request(request, RegisterUserForm)
     if request.method == 'POST' and form.is_valid():
         form.save()
-        resources.send_new_signup_email(request, form.instance)
+        # if the address is being validated, validate_signup_email_with_mailgun sends this once it passes
+        if not form.instance.email_validation_pending:
+            resources.send_new_signup_email(request, form.instance)
         return render(request, 'registration/sign-up-success.html', {
             'status': 'Success!',
             'message': 'Thank you. Please check your email for a verification link.',
@@ -54,6 +56,8 @@ def verify_user(request, user_id, activation_nonce):
         return render(request, 'registration/verified.html')
     if not user.is_active:
         return render(request, 'registration/verified.html', {'error': 'This account is not active and cannot be verified.'})
+    if user.email_validation_pending:
+        return render(request, 'registration/verified.html', {'error': "We're still checking this email address. Please try again in a few minutes."})
 
     error = None
     mailing_list_message = "We have not signed you up for our newsletter, Lawvocado. Sign up any time from our homepage."
@@ -107,6 +111,8 @@ def resend_verification(request):
         else:
             if user.email_verified:
                 form.add_error('email', "Email address is already verified.")
+            elif user.email_validation_pending:
+                form.add_error('email', "We're still checking this email address. A verification link will be sent when we're done.")
         if form.is_valid():
             resources.send_new_signup_email(request, user)
             return render(request, 'registration/sign-up-success.html', {
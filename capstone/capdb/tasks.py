@@ -135,18 +135,24 @@ def update_elasticsearch_for_vol(self, volume_id):
 
 
 @shared_task(acks_late=True)  # use acks_late for tasks that can be safely re-run if they fail
-def update_elasticsearch_from_queue():
+def update_elasticsearch_from_queue(only_for=None):
     """
         Index 100 cases that need to be indexed, in a loop, until we run out.
+        If only_for is a list of case ids, process only the queue entries for those cases.
     """
     if not settings.MAINTAIN_ELASTICSEARCH_INDEX:
         return
     batch_size = 100
+    deleted_queue = CaseDeleted.objects.filter(indexed=False)
+    updated_queue = CaseLastUpdate.objects.filter(indexed=False)
+    if only_for is not None:
+        deleted_queue = deleted_queue.filter(case_id__in=only_for)
+        updated_queue = updated_queue.filter(case_id__in=only_for)
 
     # check for deletes
     while True:
         with transaction.atomic(using='capdb'):
-            case_ids = list(CaseDeleted.objects.filter(indexed=False).select_for_update(skip_locked=True)[:batch_size].values_list('case_id', flat=True))
+            case_ids = list(deleted_queue.select_for_update(skip_locked=True)[:batch_size].values_list('case_id', flat=True))
             if case_ids:
                 for case_id in case_ids:
                     try:
@@ -164,7 +170,7 @@ def update_elasticsearch_from_queue():
     # check for updates
     while True:
         with transaction.atomic(using='capdb'):
-            case_ids = list(CaseLastUpdate.objects.filter(indexed=False).select_for_update(skip_locked=True)[:batch_size].values_list('case_id', flat=True))
+            case_ids = list(updated_queue.select_for_update(skip_locked=True)[:batch_size].values_list('case_id', flat=True))
             if case_ids:
                 cases = list(CaseMetadata.objects.filter(id__in=case_ids).for_indexing())
                 CaseMetadata.reindex_cases(cases)
@@ -551,6 +551,14 @@ def test_update_elasticsearch_from_queue(case, elasticsearch):
     assert list(CaseLastUpdate.objects.values_list('case_id', 'indexed')) == [(case.id, True)]
     assert CaseDocument.get(case.pk).name_abbreviation == 'New Name'
 
+    # only_for skips queue entries for other cases
+    case.name_abbreviation = 'Newer Name'
+    case.save()
+    update_elasticsearch_from_queue(only_for=[case.pk + 1])
+    assert list(CaseLastUpdate.objects.values_list('case_id', 'indexed')) == [(case.id, False)]
+    update_elasticsearch_from_queue(only_for=[case.pk])
+    assert CaseDocument.get(case.pk).name_abbreviation == 'Newer Name'
+
     # case gets removed when in_scope changes
     case.duplicative = True
     case.save()
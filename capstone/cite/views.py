@@ -45,6 +45,9 @@ from scripts.extract_cites import extract_whole_cite
 from scripts.helpers import group_by
 
 
+non_cite_chars_re = re.compile(r'[^0-9a-z]')
+
+
 def safe_redirect(request):
     """ Redirect to request.GET['next'] if it exists and is safe, or else to '/' """
     next = request.POST.get('next') or request.GET.get('next') or '/'
@@ -213,7 +216,7 @@ def case_editor(request, case_id):
 
     # handle save
     if request.method == 'POST':
-        data = json.loads(request.body.decode('utf8'))
+        data = json.loads(request.body)
 
         # update pages, if needed
         pages_to_save = []
@@ -321,7 +324,7 @@ def citation(request, series_slug, volume_number_slug, page_number, case_id=None
             raise Http404
     else:
         full_cite = "%s %s %s" % (volume_number_slug, series_slug.replace('-', ' ').title(), page_number)
-        normalized_cite = re.sub(r'[^0-9a-z]', '', full_cite.lower())
+        normalized_cite = non_cite_chars_re.sub('', full_cite.lower())
         resolved = ResolveDocument.search().filter("term", citations__normalized_cite=normalized_cite).execute()
         resolved_by_source = None
 
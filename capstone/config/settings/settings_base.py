@@ -401,6 +401,7 @@ CACHED_COUNT_TIMEOUT = 60*60*24*7  # 'count' value in API responses is cached fo
 CACHED_LIL_DATA_TIMEOUT = 60*60*24  # news and contributor data from LIL site is cached once a day
 LIVE_COUNT_TIME_LIMIT = 2  # number of seconds to try to generate a count while preparing an API response
 TASK_COUNT_TIME_LIMIT = 120  # number of seconds to try to generate a count in background task
+EMAIL_BLOCKLIST_CACHE_TIMEOUT = 60*5  # how long each process caches the EmailBlocklist table
 
 # EMAIL
 EMAIL_USE_TLS = True
@@ -586,6 +587,7 @@ MAILCHIMP = {
 
 MAILGUN_API_KEY = ''
 VALIDATE_EMAIL_SIGNUPS = False
+TRUSTED_EMAIL_DOMAINS = ['edu']  # skip mailgun validation for addresses at these domains and their subdomains
 
 SITE_LIMIT_REPORT = False
 
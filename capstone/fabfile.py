@@ -105,9 +105,9 @@ def run_frontend(port=None):
 
 
 @task
-def test():
-    """Run tests with coverage report."""
-    local("pytest --fail-on-template-vars --cov --cov-report=")
+def test(create_db=False):
+    """Run tests with coverage report. Pass create_db=1 to rebuild the test database after model changes."""
+    local("pytest --fail-on-template-vars --cov --cov-report=%s" % (" --create-db" if create_db else ""))
 
 
 @task(alias="pip-compile")
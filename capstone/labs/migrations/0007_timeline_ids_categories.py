@@ -4,40 +4,49 @@ from django.db import migrations
 from labs.models import get_short_uuid
 
 
-# Move IDS for cases, events, and categories to strings from integers
-def change_ids(apps, schema_editor):
+BATCH_SIZE = 500
+
+
+# Move IDS for cases, events, and categories to strings from integers, and make sure
+# the timeline and each of its events and cases has a list of categories
+def change_ids_and_add_categories(apps, schema_editor):
     Timeline = apps.get_model("labs", "Timeline")
-    for timeline in Timeline.objects.all():
+    batch = []
+    for timeline in Timeline.objects.all().iterator(chunk_size=BATCH_SIZE):
+        dirty = False
         for event in timeline.timeline['events']:
-            if type(event['id']) is int:
+            if isinstance(event['id'], int):
                 event['id'] = get_short_uuid()
+                dirty = True
+            if 'categories' not in event:
+                event['categories'] = []
+                dirty = True
 
         for case in timeline.timeline['cases']:
-            if type(case['id']) is int:
+            if isinstance(case['id'], int):
                 case['id'] = get_short_uuid()
+                dirty = True
+            if 'categories' not in case:
+                case['categories'] = []
+                dirty = True
 
         if 'categories' in timeline.timeline:
             for cat in timeline.timeline['categories']:
-                if ('id' in cat and type(cat['id']) is int) or ('id' not in cat):
+                if ('id' in cat and isinstance(cat['id'], int)) or ('id' not in cat):
                     cat['id'] = get_short_uuid()
-
-        timeline.save()
-
-
-def add_categories(apps, schema_editor):
-    Timeline = apps.get_model("labs", "Timeline")
-
-    for timeline in Timeline.objects.all():
-        for event in timeline.timeline['events']:
-            if 'categories' not in event:
-                event['categories'] = []
-        for case in timeline.timeline['cases']:
-            if 'categories' not in case:
-                case['categories'] = []
-        if 'categories' not in timeline.timeline:
+                    dirty = True
+        else:
             timeline.timeline['categories'] = []
+            dirty = True
 
-        timeline.save()
+        # skip the write for timelines that were already up to date
+        if not dirty:
+            continue
+        batch.append(timeline)
+        if len(batch) >= BATCH_SIZE:
+            Timeline.objects.bulk_update(batch, ['timeline'])
+            batch.clear()
+    Timeline.objects.bulk_update(batch, ['timeline'])
 
 
 class Migration(migrations.Migration):
@@ -46,6 +55,5 @@ class Migration(migrations.Migration):
     ]
 
     operations = [
-        migrations.RunPython(change_ids, migrations.RunPython.noop),
-        migrations.RunPython(add_categories, migrations.RunPython.noop),
+        migrations.RunPython(change_ids_and_add_categories, migrations.RunPython.noop),
     ]
@@ -6,8 +6,12 @@ from capapi.models import CapUser
 #======================== CHRONOLAWGIC
 
 
+# reuse one generator rather than rebuilding the alphabet for every id
+short_uuid_generator = shortuuid.ShortUUID()
+
+
 def get_short_uuid():
-    return shortuuid.ShortUUID().random(length=10)
+    return short_uuid_generator.random(length=10)
 
 
 class Timeline(models.Model):
@@ -17,7 +21,7 @@ class Timeline(models.Model):
 
     def save(self, bypass_uuid_check=False, *args, **kwargs):
         if self._state.adding or bypass_uuid_check:
-            collision = Timeline.objects.filter(uuid=self.uuid).count() > 0
+            collision = Timeline.objects.filter(uuid=self.uuid).exists()
             attempts = 0
             while collision:
                 if attempts > 4:
@@ -25,7 +29,7 @@ class Timeline(models.Model):
                 attempts += 1
                 new_uuid = get_short_uuid()
                 self.uuid = new_uuid
-                collision = Timeline.objects.filter(uuid=self.uuid).count() > 0
+                collision = Timeline.objects.filter(uuid=self.uuid).exists()
         with transaction.atomic():
             self.normalize_and_validate_timeline() #throws TimelineValidationException if not valid
             return super(Timeline, self).save(*args, **kwargs)
@@ -1,13 +1,23 @@
+import json
+from copy import deepcopy
+from types import MappingProxyType
+
 import pytest
 from bs4 import BeautifulSoup
 from capweb.helpers import reverse
 from capapi.tests.helpers import check_response
+from labs import views
 from labs.models import Timeline
 
 
-timeline = {"title": "My first timeline", "author": "Caselaw Bob", "description": "And my very best one"}
+# timelines live in the default database; tests that also touch capdb mark themselves
+pytestmark = pytest.mark.django_db(databases=['default'])
+
+# read-only -- tests get their own copy from the timeline fixture, since saving a Timeline normalizes it in place
+timeline_template = MappingProxyType({"title": "My first timeline", "author": "Caselaw Bob", "description": "And my very best one"})
 create_url = reverse('labs:chronolawgic-api-create')
 retrieve_url = reverse('labs:chronolawgic-api-retrieve')
+dashboard_url = reverse('labs:chronolawgic-dashboard')
 cases = [
     {'id': 'abc1', 'url': 'https://cite.case.law/ill/1/176/', 'name': 'Case 2', 'citation': '1 Mass. 1',
      'reporter': "Abb. Pr.- Abbott's Practice Reports", 'jurisdiction': 'California',
@@ -43,10 +53,15 @@ complete_timeline = {"title": "My first timeline",
                      }
 
 
+@pytest.fixture
+def timeline():
+    return dict(timeline_template)
+
+
 @pytest.mark.django_db(databases=['default', 'capdb'])
-def test_show_timelines(client, auth_client):
+def test_show_timelines(client):
     # check to see it includes api urls since everything else is rendered in Vue
-    response = client.get(reverse('labs:chronolawgic-dashboard'))
+    response = client.get(dashboard_url)
     check_response(response, content_includes="chronolawgic_api_create")
     soup = BeautifulSoup(response.content.decode(), 'html.parser')
     links = soup.find_all('a')
@@ -55,16 +70,15 @@ def test_show_timelines(client, auth_client):
         if 'login/' in link.get('href'):
             login_link = link
             break
-    assert login_link.get('href').split('?next=')[1] == reverse('labs:chronolawgic-dashboard')
+    assert login_link.get('href').split('?next=')[1] == dashboard_url
     assert login_link and login_link.text.strip() == 'Log in'
 
 
-@pytest.mark.django_db(databases=['default'])
-def test_create_timeline(client, auth_client):
+def test_create_timeline(client, auth_client, timeline):
     # should not allow timeline creation to not-authenticated users
     response = client.post(create_url, timeline)
     check_response(response, status_code=403, content_type="application/json")
-    assert Timeline.objects.count() == 0
+    assert not Timeline.objects.exists()
 
     response = auth_client.post(create_url, timeline)
     check_response(response, content_type="application/json")
@@ -73,8 +87,7 @@ def test_create_timeline(client, auth_client):
     assert Timeline.objects.first().timeline['categories'] == []
 
 
-@pytest.mark.django_db(databases=['default'])
-def test_timeline_retrieve(client, auth_client):
+def test_timeline_retrieve(client, auth_client, timeline):
     tl = Timeline.objects.create(created_by=auth_client.auth_user, timeline=timeline)
     # allow retrieval by anyone
     response = client.get(retrieve_url + tl.uuid)
@@ -91,9 +104,7 @@ def test_timeline_retrieve(client, auth_client):
     check_response(response, content_type="application/json")
 
     # if authorized show all timelines when no id is given
-    timeline['cases'] = cases
-    timeline['events'] = events
-    tl.timeline = timeline
+    tl.timeline = {**timeline, 'cases': deepcopy(cases), 'events': deepcopy(events)}
     tl.save()
 
     response = auth_client.get(retrieve_url)
@@ -104,102 +115,69 @@ def test_timeline_retrieve(client, auth_client):
     assert timelines_response[0]["event_count"] == len(events)
 
 
-@pytest.mark.django_db(databases=['default'])
-def test_timeline_update(client, auth_client):
+def test_timeline_update(client, auth_client, timeline):
     tl = Timeline.objects.create(created_by=auth_client.auth_user, timeline=timeline)
-    response = auth_client.get(retrieve_url + tl.uuid)
-    check_response(response, content_type="application/json", content_includes='"title": "My first timeline"')
-    assert response.json()["timeline"]["title"] == timeline["title"]
 
     new_title = "My second timeline attempt"
-    timeline["title"] = new_title
     update_url = reverse('labs:chronolawgic-update-timeline-metadata', args=[tl.uuid])
-    response = auth_client.post(update_url, timeline, format='json')
-    check_response(response, content_type="application/json", content_includes='"title": "My second timeline attempt"')
+    response = auth_client.post(update_url, {**timeline, "title": new_title}, format='json')
+    check_response(response, content_type="application/json")
     assert response.json()["timeline"]["title"] == new_title
 
-    new_title = "My third timeline attempt"
-    timeline["title"] = new_title
-
-    update_url = reverse('labs:chronolawgic-update-timeline-metadata', args=[tl.uuid])
-
     # don't allow unauthenticated users
-    response = client.post(update_url, timeline, format='json')
+    response = client.post(update_url, {**timeline, "title": "My third timeline attempt"}, format='json')
     check_response(response, status_code=403, content_type="application/json")
-
-    response = auth_client.get(retrieve_url + tl.uuid)
-    assert response.json()["timeline"]["title"] != timeline["title"]
-
-
-@pytest.mark.django_db(databases=['default'])
-def test_timeline_update_validation(client, auth_client):
-    tl = Timeline()
-    tl.created_by = auth_client.auth_user
-    tl.timeline = complete_timeline
-    tl.save()
-
-    tl.timeline['description'] = "And my very best on"
-    update_url = reverse('labs:chronolawgic-update-timeline-metadata', args=[tl.uuid])
-    response = auth_client.post(update_url, tl.timeline, format='json')
-    check_response(response, content_type="application/json")
     tl.refresh_from_db()
+    assert tl.timeline["title"] == new_title
 
-    # wrong data type will get replaced with default 'untitled timeline'
-    tl.timeline['title'] = [1,2,3,4]
-    tl.update_timeline_metadata(tl.timeline)
-    response = auth_client.post(update_url, tl.timeline, format='json')
-    check_response(response, status_code=200, content_type="application/json", content_includes='"title": "Untitled Timeline"')
-    tl.refresh_from_db()
 
+@pytest.mark.parametrize("subobject_type, get_payload, status_code, content_includes", [
+    # valid metadata update
+    (None, lambda data: {**data, 'description': "And my very best on"}, 200, '"description": "And my very best on"'),
+    # wrong data type will get replaced with default 'untitled timeline'
+    (None, lambda data: {**data, 'title': [1, 2, 3, 4]}, 200, '"title": "Untitled Timeline"'),
     # wrong data type for whole object will not get replaced
-    update_url = reverse('labs:chronolawgic-api-add-update-subobject', args=[tl.uuid, 'events'])
-    response = auth_client.post(update_url, [1, 2, 3, 4], format='json')
-    check_response(response, status_code=400, content_type="application/json", content_includes='Wrong Data Type for events entry')
-    tl.refresh_from_db()
-
-
+    ('events', lambda data: [1, 2, 3, 4], 400, 'Wrong Data Type for events entry'),
     # wrong data type for field object will not get replaced
-    tl.timeline['events'][0]['id'] = [1,2,3,4]
-    response = auth_client.post(update_url, tl.timeline['events'][0], format='json')
-    check_response(response, status_code=400, content_type="application/json", content_includes='Wrong Data Type for id')
-    tl.refresh_from_db()
-
+    ('events', lambda data: {**data['events'][0], 'id': [1, 2, 3, 4]}, 400, 'Wrong Data Type for id'),
     # missing required case value
-    del tl.timeline['cases'][0]['id']
-    update_url = reverse('labs:chronolawgic-api-add-update-subobject', args=[tl.uuid, 'cases'])
-    response = auth_client.post(update_url, tl.timeline['cases'][0], format='json')
-    check_response(response, status_code=400, content_type="application/json", content_includes="Missing cases field id")
-    tl.refresh_from_db()
-
+    ('cases', lambda data: {k: v for k, v in data['cases'][0].items() if k != 'id'}, 400, 'Missing cases field id'),
     # extraneous timeline field
-    tl.timeline["helloooooo"] = "badata"
-    update_url = reverse('labs:chronolawgic-update-timeline-metadata', args=[tl.uuid])
-    response = auth_client.post(update_url, tl.timeline, format='json')
-    check_response(response, status_code=400, content_type="application/json", content_includes="Unexpected timeline field")
-    tl.refresh_from_db()
-    assert "helloooooo" not in tl.timeline
-
-
-
-@pytest.mark.django_db(databases=['default'])
-def test_timeline_delete(client, auth_client):
+    (None, lambda data: {**data, 'helloooooo': 'badata'}, 400, 'Unexpected timeline field'),
+], ids=['valid_metadata', 'wrong_title_type', 'wrong_events_type', 'wrong_event_id_type', 'missing_case_id', 'extraneous_field'])
+def test_timeline_update_validation(rf, auth_user, django_assert_num_queries, subobject_type, get_payload, status_code, content_includes):
+    # validation doesn't depend on routing or middleware, so call the views directly
+    tl = Timeline.objects.create(created_by=auth_user, timeline=deepcopy(complete_timeline))
+    request = rf.post('/', json.dumps(get_payload(deepcopy(tl.timeline))), content_type='application/json')
+    request.user = auth_user
+    # fetch the timeline, and save it only if the update is valid
+    expected_queries = {'select': 1, 'update': 1} if status_code == 200 else {'select': 1}
+    with django_assert_num_queries(db='default', **expected_queries):
+        if subobject_type:
+            response = views.chronolawgic_add_update_subobject(request, subobject_type, tl.uuid)
+        else:
+            response = views.chronolawgic_update_timeline_metadata(request, tl.uuid)
+    check_response(response, status_code=status_code, content_type="application/json", content_includes=content_includes)
+
+    # invalid updates are not saved
+    if status_code == 400:
+        assert Timeline.objects.get(pk=tl.pk).timeline == tl.timeline
+
+
+def test_timeline_delete(client, auth_client, timeline):
     tl = Timeline.objects.create(created_by=auth_client.auth_user, timeline=timeline)
 
-    response = auth_client.get(retrieve_url + tl.uuid)
-    check_response(response, content_type="application/json")
-    assert response.json()["timeline"]["title"] == timeline["title"]
-
     delete_url = reverse('labs:chronolawgic-api-delete', args=[tl.uuid])
 
     # don't allow unauthenticated users
     response = client.delete(delete_url)
     check_response(response, status_code=403, content_type="application/json")
-    assert Timeline.objects.filter(created_by=auth_client.auth_user).count() == 1
+    assert Timeline.objects.filter(created_by=auth_client.auth_user).exists()
 
     # allow authenticated creators of timeline
     response = auth_client.delete(delete_url)
     check_response(response, content_type="application/json")
-    assert Timeline.objects.filter(created_by=auth_client.auth_user).count() == 0
+    assert not Timeline.objects.filter(created_by=auth_client.auth_user).exists()
 
 @pytest.mark.django_db(databases=['default', 'capdb'])
 def test_update_categories(client, auth_client):
@@ -75,8 +75,8 @@ def chronolawgic_api_retrieve(request, timeline_uuid=None):
         'first_year': first_year,
         'last_year': last_year,
         'id': timeline_record.uuid,
-        'created_by': timeline_record.created_by.id,
-        'is_owner': True if request.user == timeline_record.created_by else False
+        'created_by': timeline_record.created_by_id,
+        'is_owner': request.user.pk == timeline_record.created_by_id
     })
 
 
@@ -88,7 +88,7 @@ def chronolawgic_update_timeline_metadata(request, timeline_uuid):
         timeline_record = Timeline.objects.get(uuid=timeline_uuid)
     except Timeline.DoesNotExist:
         return JsonResponse({'status': 'err', 'reason': 'not_found'}, status=404)
-    if not request.user.is_authenticated or timeline_record.created_by.pk != request.user.pk:
+    if not request.user.is_authenticated or timeline_record.created_by_id != request.user.pk:
         return JsonResponse({'status': 'err', 'reason': 'auth'}, status=403)
 
     try:
@@ -139,7 +139,7 @@ def chronolawgic_update_categories(request, timeline_uuid):
     except Timeline.DoesNotExist:
         return JsonResponse({'status': 'err', 'reason': 'timeline_not_found'}, status=404)
 
-    if not request.user.is_authenticated or request.user != timeline_record.created_by:
+    if not request.user.is_authenticated or request.user.pk != timeline_record.created_by_id:
         return JsonResponse({'status': 'err', 'reason': 'auth'}, status=403)
 
     try:
@@ -172,7 +172,7 @@ def chronolawgic_add_update_subobject(request, subobject_type, timeline_uuid):
     except Timeline.DoesNotExist:
         return JsonResponse({'status': 'err', 'reason': 'timeline_not_found'}, status=404)
 
-    if not request.user.is_authenticated or request.user != timeline_record.created_by:
+    if not request.user.is_authenticated or request.user.pk != timeline_record.created_by_id:
         return JsonResponse({'status': 'err', 'reason': 'auth'}, status=403)
 
     try:
@@ -213,7 +213,7 @@ def chronolawgic_delete_subobject(request, timeline_uuid, subobject_type, subobj
     except Timeline.DoesNotExist:
         return JsonResponse({'status': 'err', 'reason': 'timeline_not_found'}, status=404)
 
-    if not request.user.is_authenticated or request.user != timeline_record.created_by:
+    if not request.user.is_authenticated or request.user.pk != timeline_record.created_by_id:
         return JsonResponse({'status': 'err', 'reason': 'auth'}, status=403)
 
     timeline_record.delete_subobject(subobject_type, subobject_uuid)
@@ -245,7 +245,7 @@ def chronolawgic_api_delete(request, timeline_uuid):
     except Timeline.DoesNotExist:
         return JsonResponse({'status': 'err', 'reason': 'not_found'}, status=404)
 
-    if not request.user.is_authenticated or timeline_record.created_by.pk != request.user.pk:
+    if not request.user.is_authenticated or timeline_record.created_by_id != request.user.pk:
         return JsonResponse({'status': 'err', 'reason': 'auth'}, status=403)
 
     try:
@@ -88,6 +88,14 @@ def clear_caches(request):
                 model.reset_cache()
 
 
+@pytest.fixture(autouse=True)
+def no_mailgun_requests():
+    """ Stub out the mailgun validation api, so tests that enable VALIDATE_EMAIL_SIGNUPS never make real requests. """
+    mailgun_response = mock.Mock(**{'json.return_value': {'result': 'deliverable', 'reason': []}})
+    with mock.patch('capapi.tasks.mailgun_session.get', return_value=mailgun_response):
+        yield
+
+
 @pytest.fixture(scope='function')
 def django_assert_num_queries(pytestconfig):
     """